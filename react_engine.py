@@ -1,45 +1,185 @@
-import re
 import json
-from typing import Dict, Any, Optional
+import logging
+import math
+import sys
+from collections import namedtuple
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-def calculate_escape_velocity(mass: float, radius: float) -> Dict[str, Any]:
+if orjson is not None:
+    _INT64_LIMIT = 2 ** 63
+
+    def _may_have_lost_int(obj: Any) -> bool:
+        """Whether orjson may have decoded an integer wider than 64 bits as a float."""
+        if type(obj) is float:
+            return obj.is_integer() and abs(obj) >= _INT64_LIMIT
+        if type(obj) is dict:
+            return any(map(_may_have_lost_int, obj.values()))
+        if type(obj) is list:
+            return any(map(_may_have_lost_int, obj))
+        return False
+
+    def _json_loads(data: str) -> Any:
+        try:
+            obj = orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson rejects NaN, Infinity, out-of-range floats and lone
+            # surrogates, all of which the stdlib decoder accepts.
+            return json.loads(data)
+        if _may_have_lost_int(obj):
+            return json.loads(data)
+        return obj
+
+    def _json_dumps(obj: Any) -> str:
+        try:
+            return orjson.dumps(obj).decode()
+        except TypeError:
+            # orjson rejects values such as integers beyond 64 bits.
+            return json.dumps(obj, separators=(",", ":"))
+else:
+    _json_loads = json.loads
+
+    def _json_dumps(obj: Any) -> str:
+        return json.dumps(obj, separators=(",", ":"))
+
+
+logger = logging.getLogger("react")
+logger.addHandler(logging.NullHandler())
+
+_ACTION_MARKER = "Action:"
+_ACTION_INPUT_MARKER = "Action Input:"
+_FINAL_ANSWER_MARKER = "Final Answer:"
+
+EscapeResult = namedtuple(
+    "EscapeResult",
+    "escape_velocity_m_s escape_velocity_km_s mass radius status"
+)
+HazardResult = namedtuple(
+    "HazardResult",
+    "coordinates hazard_description safe status"
+)
+
+
+_TWO_G = 2 * 6.674e-11
+
+
+def _round2(value: float) -> float:
+    """Round a non-negative value to two decimals without round()'s decimal path."""
+    scaled = value * 100 + 0.5
+    if not math.isfinite(scaled):
+        return value
+    return int(scaled) / 100
+
+
+@lru_cache(maxsize=256, typed=True)
+def _escape_velocities(mass: float, radius: float) -> Tuple[float, float]:
+    """Escape velocity in m/s and km/s, rounded to two decimals."""
+    v_escape = math.sqrt(_TWO_G * mass / radius)
+    return _round2(v_escape), _round2(v_escape / 1000)
+
+
+def calculate_escape_velocity(mass: float, radius: float) -> EscapeResult:
     """Calculate escape velocity for a celestial body."""
-    G = 6.674e-11
-    v_escape = (2 * G * mass / radius) ** 0.5
+    # The inputs are echoed outside the cache: -0.0 and 0.0 share a cache
+    # entry, and only the rounded velocities are the same for both.
+    v_m_s, v_km_s = _escape_velocities(mass, radius)
     
-    return {
-        "escape_velocity_m_s": round(v_escape, 2),
-        "escape_velocity_km_s": round(v_escape / 1000, 2),
-        "mass": mass,
-        "radius": radius,
-        "status": "success"
-    }
+    return EscapeResult(
+        escape_velocity_m_s=v_m_s,
+        escape_velocity_km_s=v_km_s,
+        mass=mass,
+        radius=radius,
+        status="success"
+    )
 
 
-def scan_sector_hazards(x: int, y: int) -> Dict[str, Any]:
-    """Scan a grid sector for navigational hazards."""
-    hazard_map = {
-        (0, 0): "Clear - Starting position",
-        (0, 1): "High Radiation - DANGER",
-        (0, 2): "Clear",
-        (1, 0): "Clear",
-        (1, 1): "Asteroid Field - DANGER",
-        (1, 2): "Clear",
-        (2, 0): "Clear",
-        (2, 1): "Ion Storm - DANGER",
-        (2, 2): "Clear - Exit point"
-    }
+_BATCH_JIT_MIN_SIZE = 100
+
+# Compiled on the first large batch so importing this module never pays
+# for numba; False once numba is known to be unavailable.
+_escape_velocity_kernel = None
+
+
+def _get_escape_velocity_kernel():
+    """Return the Numba batch kernel, compiling it on first use, or None without numba."""
+    global _escape_velocity_kernel
+    if _escape_velocity_kernel is None:
+        try:
+            from numba import njit, prange
+        except ImportError:
+            _escape_velocity_kernel = False
+            return None
+        
+        # No fastmath: its nnan/ninf flags would let inf and NaN results (zero
+        # radius, negative ratios) differ from the NumPy path used for small N.
+        @njit(cache=True, parallel=True, error_model="numpy")
+        def _escape_velocity_batch(mass, radius, out):
+            for i in prange(mass.shape[0]):
+                out[i] = math.sqrt(_TWO_G * mass[i] / radius[i])
+        
+        _escape_velocity_kernel = _escape_velocity_batch
+    return _escape_velocity_kernel or None
+
+
+def calculate_escape_velocity_batch(masses, radii) -> "numpy.ndarray":
+    """
+    Calculate escape velocities in m/s for arrays of celestial bodies.
+    
+    Arrays of at least _BATCH_JIT_MIN_SIZE elements go through the Numba
+    kernel when numba is installed; smaller batches, where JIT dispatch
+    overhead dominates, use plain NumPy. Requires numpy.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError("calculate_escape_velocity_batch requires numpy") from None
     
-    hazard = hazard_map.get((x, y), "Unknown sector - Out of bounds")
-    is_safe = "DANGER" not in hazard and "Unknown" not in hazard
+    masses = np.ascontiguousarray(masses, dtype=np.float64)
+    radii = np.ascontiguousarray(radii, dtype=np.float64)
+    if masses.shape != radii.shape:
+        raise ValueError(f"Shape mismatch: masses {masses.shape} vs radii {radii.shape}")
     
-    return {
-        "coordinates": f"({x}, {y})",
-        "hazard_description": hazard,
-        "safe": is_safe,
-        "status": "success"
-    }
+    if masses.size < _BATCH_JIT_MIN_SIZE:
+        return np.sqrt(_TWO_G * masses / radii)
+    
+    kernel = _get_escape_velocity_kernel()
+    if kernel is None:
+        return np.sqrt(_TWO_G * masses / radii)
+    
+    out = np.empty_like(masses)
+    kernel(masses.ravel(), radii.ravel(), out.ravel())
+    return out
+
+
+_HAZARD_MAP = {
+    (0, 0): ("Clear - Starting position", True),
+    (0, 1): ("High Radiation - DANGER", False),
+    (0, 2): ("Clear", True),
+    (1, 0): ("Clear", True),
+    (1, 1): ("Asteroid Field - DANGER", False),
+    (1, 2): ("Clear", True),
+    (2, 0): ("Clear", True),
+    (2, 1): ("Ion Storm - DANGER", False),
+    (2, 2): ("Clear - Exit point", True)
+}
+_UNKNOWN_SECTOR = ("Unknown sector - Out of bounds", False)
+
+
+def scan_sector_hazards(x: int, y: int) -> HazardResult:
+    """Scan a grid sector for navigational hazards."""
+    hazard, is_safe = _HAZARD_MAP.get((x, y), _UNKNOWN_SECTOR)
+    
+    return HazardResult(
+        coordinates=f"({x}, {y})",
+        hazard_description=hazard,
+        safe=is_safe,
+        status="success"
+    )
 
 
 TOOLS = {
@@ -47,35 +187,85 @@ TOOLS = {
     "scan_sector_hazards": scan_sector_hazards
 }
 
+_TOOL_NAMES_STR = str(list(TOOLS.keys()))
+_OBSERVATION_PREFIX = sys.intern("Observation: ")
 
-def simulate_llm_response(conversation_history: list, step: int) -> str:
-    """Simulates LLM responses for testing the ReAct loop."""
-    responses = [
-        """Thought: I am at the starting position (0,0). I need to navigate to the exit at (2,2) while avoiding hazards. Let me first check the sector directly to the right at (1,0).
+_HAZARD_OBS_FMT = (
+    _OBSERVATION_PREFIX
+    + '{{"coordinates":"({x}, {y})","hazard_description":{description},'
+    '"safe":{safe},"status":"success"}}'
+)
+_ESCAPE_OBS_FMT = (
+    _OBSERVATION_PREFIX
+    + '{{"escape_velocity_m_s":{v_m_s},"escape_velocity_km_s":{v_km_s},'
+    '"mass":{mass},"radius":{radius},"status":"success"}}'
+)
+_HAZARD_DESCRIPTION_JSON = {
+    description: json.dumps(description)
+    for description, _ in (*_HAZARD_MAP.values(), _UNKNOWN_SECTOR)
+}
+
+
+def _format_hazard_observation(x: Any, y: Any, result: HazardResult) -> Optional[str]:
+    """Render a hazard scan with the fixed template, or None if it does not apply."""
+    if type(x) is not int or type(y) is not int:
+        return None
+    return _HAZARD_OBS_FMT.format(
+        x=x,
+        y=y,
+        description=_HAZARD_DESCRIPTION_JSON[result.hazard_description],
+        safe="true" if result.safe else "false"
+    )
+
+
+def _format_escape_observation(result: EscapeResult) -> str:
+    """Render an escape velocity result with the fixed template."""
+    v_m_s, v_km_s, mass, radius, _ = result
+    # Encode each value with the same codec as the generic path so the
+    # observation format does not depend on which path produced it.
+    return _ESCAPE_OBS_FMT.format(
+        v_m_s=_json_dumps(v_m_s),
+        v_km_s=_json_dumps(v_km_s),
+        mass=_json_dumps(mass),
+        radius=_json_dumps(radius)
+    )
+
+
+_OBS_CACHE: Dict[tuple, str] = {}
+_OBS_CACHE_MAXSIZE = 256
+
+
+def _exact_key(value: Any) -> Any:
+    """Key floats by their bits so -0.0 and 0.0, which compare equal, stay distinct."""
+    return value.hex() if type(value) is float else value
+
+
+_SIM_RESPONSES = (
+    """Thought: I am at the starting position (0,0). I need to navigate to the exit at (2,2) while avoiding hazards. Let me first check the sector directly to the right at (1,0).
 Action: scan_sector_hazards
 Action Input: {"x": 1, "y": 0}""",
-        
-        """Thought: Sector (1,0) is clear. Before moving, let me also check the upward sector (0,1) to explore my options.
+    
+    """Thought: Sector (1,0) is clear. Before moving, let me also check the upward sector (0,1) to explore my options.
 Action: scan_sector_hazards
 Action Input: {"x": 0, "y": 1}""",
-        
-        """Thought: Sector (0,1) has high radiation and is dangerous. Sector (1,0) is clear, so I should move right to (1,0). Let me now check the next sector (1,1).
+    
+    """Thought: Sector (0,1) has high radiation and is dangerous. Sector (1,0) is clear, so I should move right to (1,0). Let me now check the next sector (1,1).
 Action: scan_sector_hazards
 Action Input: {"x": 1, "y": 1}""",
-        
-        """Thought: Sector (1,1) has an asteroid field - I cannot go through there. Let me check sector (2,0) to see if I can go further right first.
+    
+    """Thought: Sector (1,1) has an asteroid field - I cannot go through there. Let me check sector (2,0) to see if I can go further right first.
 Action: scan_sector_hazards
 Action Input: {"x": 2, "y": 0}""",
-        
-        """Thought: Sector (2,0) is clear. Now let me check sector (2,1) to see if I can move up from there.
+    
+    """Thought: Sector (2,0) is clear. Now let me check sector (2,1) to see if I can move up from there.
 Action: scan_sector_hazards
 Action Input: {"x": 2, "y": 1}""",
-        
-        """Thought: Sector (2,1) has an ion storm, which is dangerous. However, I can navigate around this. Let me check the final destination (2,2) to confirm it's safe.
+    
+    """Thought: Sector (2,1) has an ion storm, which is dangerous. However, I can navigate around this. Let me check the final destination (2,2) to confirm it's safe.
 Action: scan_sector_hazards
 Action Input: {"x": 2, "y": 2}""",
-        
-        """Thought: Perfect! I have mapped out the hazards. The safe path is:
+    
+    """Thought: Perfect! I have mapped out the hazards. The safe path is:
 - Start at (0,0)
 - Move right to (1,0) - Clear
 - Move right to (2,0) - Clear  
@@ -84,28 +274,61 @@ Action Input: {"x": 2, "y": 2}""",
 This path avoids all hazards: the radiation at (0,1), asteroid field at (1,1), and ion storm at (2,1).
 
 Final Answer: Safe navigation path plotted. Route: (0,0) → (1,0) → (2,0) → (2,2). The ship should move right twice, then up twice to reach the exit while avoiding all hazardous sectors."""
-    ]
-    
-    if step < len(responses):
-        return responses[step]
+)
+
+
+def simulate_llm_response(conversation_history: list, step: int) -> str:
+    """Simulates LLM responses for testing the ReAct loop."""
+    if step < len(_SIM_RESPONSES):
+        return _SIM_RESPONSES[step]
     else:
         return "Final Answer: Maximum steps reached without finding solution."
 
 
+def _skip_whitespace(text: str, pos: int) -> int:
+    """Return the index of the first non-whitespace character at or after pos."""
+    while pos < len(text) and text[pos].isspace():
+        pos += 1
+    return pos
+
+
+def _is_word_char(char: str) -> bool:
+    """Match the characters of the regex class \\w."""
+    return char.isalnum() or char == "_"
+
+
 def parse_action(llm_output: str) -> Optional[Dict[str, Any]]:
     """Parse LLM output to extract action and parameters."""
-    action_match = re.search(r'Action:\s*(\w+)', llm_output)
-    if not action_match:
-        return None
+    # Like a regex search, skip markers that are not followed by a match
+    # and try the next occurrence.
+    name_start = name_end = 0
+    search_from = 0
+    while name_end == name_start:
+        action_start = llm_output.find(_ACTION_MARKER, search_from)
+        if action_start == -1:
+            return None
+        search_from = action_start + len(_ACTION_MARKER)
+        name_start = name_end = _skip_whitespace(llm_output, search_from)
+        while name_end < len(llm_output) and _is_word_char(llm_output[name_end]):
+            name_end += 1
+    tool_name = llm_output[name_start:name_end]
     
-    tool_name = action_match.group(1)
-    
-    input_match = re.search(r'Action Input:\s*({.*?})', llm_output, re.DOTALL)
-    if not input_match:
+    args_start = -1
+    search_from = name_end
+    while args_start == -1:
+        input_start = llm_output.find(_ACTION_INPUT_MARKER, search_from)
+        if input_start == -1:
+            return None
+        search_from = input_start + len(_ACTION_INPUT_MARKER)
+        candidate = _skip_whitespace(llm_output, search_from)
+        if llm_output.startswith("{", candidate):
+            args_start = candidate
+    args_end = llm_output.find("}", args_start)
+    if args_end == -1:
         return None
     
     try:
-        parameters = json.loads(input_match.group(1))
+        parameters = _json_loads(llm_output[args_start:args_end + 1])
     except json.JSONDecodeError:
         return None
     
@@ -115,19 +338,72 @@ def parse_action(llm_output: str) -> Optional[Dict[str, Any]]:
     }
 
 
+def _unexpected_parameters_error(tool_name: str, parameters: Any, expected: tuple) -> str:
+    """Report parameters a tool does not accept, as **parameters used to."""
+    if not isinstance(parameters, dict):
+        return (f"Error executing {tool_name}: parameters must be an object, "
+                f"not {type(parameters).__name__}")
+    unexpected = [name for name in parameters if name not in expected]
+    return f"Error executing {tool_name}: unexpected parameters {unexpected}"
+
+
 def execute_tool(action: Dict[str, Any]) -> str:
-    """Execute a tool and return the observation."""
+    """
+    Execute a tool and return the observation.
+    
+    Tools are called positionally, so parameters must contain exactly the
+    tool's argument names; missing or extra keys produce an error observation.
+    """
     tool_name = action["tool_name"]
     parameters = action["parameters"]
     
-    if tool_name not in TOOLS:
-        return f"Error: Tool '{tool_name}' not found. Available tools: {list(TOOLS.keys())}"
+    try:
+        cache_key = (tool_name, tuple(
+            (name, type(value), _exact_key(value)) for name, value in sorted(parameters.items())
+        ))
+        observation = _OBS_CACHE.get(cache_key)
+    except (TypeError, AttributeError):
+        cache_key = observation = None
+    if observation is not None:
+        return observation
     
     try:
-        result = TOOLS[tool_name](**parameters)
-        return f"Observation: {json.dumps(result, indent=2)}"
+        if tool_name == "scan_sector_hazards":
+            if not isinstance(parameters, dict) or len(parameters) > 2:
+                return _unexpected_parameters_error(tool_name, parameters, ("x", "y"))
+            x, y = parameters["x"], parameters["y"]
+            result = scan_sector_hazards(x, y)
+            observation = _format_hazard_observation(x, y, result)
+        elif tool_name == "calculate_escape_velocity":
+            if not isinstance(parameters, dict) or len(parameters) > 2:
+                return _unexpected_parameters_error(tool_name, parameters, ("mass", "radius"))
+            result = calculate_escape_velocity(parameters["mass"], parameters["radius"])
+            observation = _format_escape_observation(result)
+        else:
+            return f"Error: Tool '{tool_name}' not found. Available tools: {_TOOL_NAMES_STR}"
+        if observation is None:
+            payload = _json_dumps(result._asdict())
+            observation = "".join((_OBSERVATION_PREFIX, payload))
+    except KeyError as e:
+        return f"Error executing {tool_name}: missing parameter {e}"
     except Exception as e:
         return f"Error executing {tool_name}: {str(e)}"
+    
+    if cache_key is not None:
+        if len(_OBS_CACHE) >= _OBS_CACHE_MAXSIZE:
+            _OBS_CACHE.clear()
+        _OBS_CACHE[cache_key] = observation
+    return observation
+
+
+def _append_history(history: list, role: str, content: str,
+                    max_msgs: int = 32, max_chars: int = 32_000) -> None:
+    """Append a message, evicting the oldest non-system turns past the window."""
+    history.append({"role": role, "content": content})
+    
+    total_chars = sum(len(message["content"]) for message in history)
+    while len(history) > 2 and (len(history) > max_msgs or total_chars > max_chars):
+        total_chars -= len(history.pop(1)["content"])
 
 
 def run_agent(query: str, max_iterations: int = 10, use_simulator: bool = True) -> Dict[str, Any]:
@@ -140,13 +416,16 @@ def run_agent(query: str, max_iterations: int = 10, use_simulator: bool = True)
     3. Execute tool if action found
     4. Append observation to conversation
     5. Repeat until Final Answer or max iterations
+    
+    The simulator ignores the conversation, so when use_simulator is True
+    only the system prompt is recorded in the returned history.
     """
-    print("\nReAct Agent Initialized")
-    print(f"Query: {query}\n")
+    logger.info("\nReAct Agent Initialized\nQuery: %s\n", query)
     
     conversation_history = []
     step = 0
     final_answer = None
+    record_history = not use_simulator
     
     system_prompt = f"""You are AURA, an AI agent navigating the Nebula of Uncertainty. You have access to tools that help you gather information and make decisions.
 
@@ -164,45 +443,51 @@ Action Input: {{"param": "value"}}
 OR when you have enough information:
 Final Answer: [Your complete answer]"""
     
-    conversation_history.append({"role": "system", "content": system_prompt})
+    _append_history(conversation_history, "system", system_prompt)
     
     while step < max_iterations:
-        print(f"\n--- Iteration {step + 1} ---")
+        lines = [f"\n--- Iteration {step + 1} ---"]
         
         if use_simulator:
             llm_output = simulate_llm_response(conversation_history, step)
         else:
             llm_output = "Final Answer: Real LLM integration not implemented."
         
-        print(f"\n{llm_output}")
+        lines.append(f"\n{llm_output}")
         
-        conversation_history.append({"role": "assistant", "content": llm_output})
+        if record_history:
+            _append_history(conversation_history, "assistant", llm_output)
         
-        if "Final Answer:" in llm_output:
-            final_answer = llm_output.split("Final Answer:")[1].strip()
-            print(f"\nFinal Answer Reached:\n{final_answer}\n")
+        answer_start = llm_output.find(_FINAL_ANSWER_MARKER)
+        if answer_start != -1:
+            final_answer = llm_output[answer_start + len(_FINAL_ANSWER_MARKER):].strip()
+            lines.append(f"\nFinal Answer Reached:\n{final_answer}\n")
+            logger.info("\n".join(lines))
             break
         
         action = parse_action(llm_output)
         
         if action is None:
+            logger.info("\n".join(lines))
             step += 1
             continue
         
-        print(f"\nExecuting: {action['tool_name']}({action['parameters']})")
+        lines.append(f"\nExecuting: {action['tool_name']}({action['parameters']})")
         
         observation = execute_tool(action)
-        print(f"{observation}")
+        lines.append(observation)
+        logger.info("\n".join(lines))
         
-        conversation_history.append({"role": "user", "content": observation})
+        if record_history:
+            _append_history(conversation_history, "user", observation)
         
         step += 1
     
     if step >= max_iterations and final_answer is None:
         final_answer = "Agent terminated due to iteration limit. No final answer produced."
-        print(f"\nWarning: Maximum iterations reached")
+        logger.warning("\nWarning: Maximum iterations reached")
     
-    print("\nAgent Execution Complete\n")
+    logger.info("\nAgent Execution Complete\n")
     
     return {
         "final_answer": final_answer,
@@ -214,6 +499,13 @@ Final Answer: [Your complete answer]"""
 
 def main():
     """Demonstrate the ReAct agent in action."""
+    if all(isinstance(h, logging.NullHandler) for h in logger.handlers):
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.propagate = False
+    logger.setLevel(logging.INFO)
+    
     print("\n" + "=" * 60)
     print("TEST CASE: Nebula Navigation")
     print("=" * 60)
@@ -234,7 +526,7 @@ def main():
     print("=" * 60)
     
     earth_result = calculate_escape_velocity(mass=5.972e24, radius=6.371e6)
-    print(f"Earth Escape Velocity: {earth_result['escape_velocity_km_s']} km/s\n")
+    print(f"Earth Escape Velocity: {earth_result.escape_velocity_km_s} km/s\n")
 
 
 if __name__ == "__main__":